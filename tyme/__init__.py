@@ -1,3 +1,4 @@
-from .api import get_suggestions, get_profile, ask_question
+from .api import get_suggestions, get_profile, ask_question, warmup
+from .suggestion_store import SuggestionStore
 
-__all__ = ["get_suggestions", "get_profile", "ask_question"]
+__all__ = ["get_suggestions", "get_profile", "ask_question", "warmup", "SuggestionStore"]
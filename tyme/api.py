@@ -4,23 +4,46 @@ from typing import Any, Optional, Literal, Mapping
 
 from .profile import profile_df
 from .prompts import build_suggest_prompt, build_chat_prompt
-from .ollama_client import generate_text
+from .ollama_client import generate_text, warmup_model, start_warmup, PRIORITY_INTERACTIVE
 from .parsing import parse_suggestions, Suggestion
+from .suggestion_store import SuggestionStore, StoreMatch, adapt_suggestions
 
 from ollama._types import Options
 from ollama import chat
 
-def get_profile(df: pd.DataFrame) -> dict[str, Any]:
+def warmup(model: str = "llama3.2", keep_alive: str | int = "10m", wait: bool = True) -> None:
+    """
+    Load a model into the Ollama server ahead of the first real request.
+
+    Args:
+        model: Ollama model name.
+        keep_alive: How long Ollama keeps the model loaded (e.g. "10m", -1 for forever).
+        wait: Block until the model is loaded. If False, load it in a background thread.
+    """
+    if wait:
+        warmup_model(model, keep_alive=keep_alive)
+    else:
+        start_warmup(model, keep_alive=keep_alive)
+
+def get_profile(
+    df: pd.DataFrame,
+    target: Optional[str] = None,
+    cross_columns: bool = False,
+    top_k: int = 10,
+) -> dict[str, Any]:
     """
     Generate a statistical profile of the DataFrame.
     
     Args:
         df: Input pandas DataFrame.
+        target: Target column name, used for target association (optional).
+        cross_columns: Also compute top correlated pairs and target associations.
+        top_k: How many pairs / target-related columns to keep.
         
     Returns:
         Dictionary containing profile metadata (shapes, columns, types, stats).
     """
-    return profile_df(df)
+    return profile_df(df, target=target, cross_columns=cross_columns, top_k=top_k)
 
 def ask_question(
     profile: dict[str, Any],
@@ -55,7 +78,8 @@ def ask_question(
         model=model, 
         prompt=chat_prompt, 
         temperature=0.4, 
-        num_predict=900
+        num_predict=900,
+        priority=PRIORITY_INTERACTIVE
     )
     return ans.strip()
 
@@ -65,6 +89,11 @@ def get_suggestions(
     task: str = "unspecified",
     target: Optional[str] = None,
     exclude_columns: Optional[list[str]] = None,
+    cross_columns: bool = False,
+    store: Optional[SuggestionStore] = None,
+    similarity_threshold: float = 0.9,
+    seed_threshold: float = 0.5,
+    force_regenerate: bool = False,
 ) -> list[Suggestion]:
     """
     Analyze a DataFrame and generate feature engineering suggestions using an LLM.
@@ -75,32 +104,88 @@ def get_suggestions(
         task: ML task type ("classification", "regression", "unspecified").
         target: Target column name (optional).
         exclude_columns: List of columns to exclude from suggestions.
+        cross_columns: Add correlated pairs and target associations to the profile.
+        store: SuggestionStore to reuse suggestions from similar datasets (optional).
+        similarity_threshold: Minimum schema similarity to reuse stored suggestions as-is.
+        seed_threshold: Minimum schema similarity to seed the prompt with stored suggestions.
+        force_regenerate: Ignore stored suggestions and call the LLM (the result is still stored).
 
     Returns:
         List of Suggestion objects.
     """
+    # 0. Load the model in the background while we profile
+    start_warmup(model)
+
     # 1. Profile the DataFrame
-    prof = profile_df(df)
+    prof = profile_df(df, target=target, cross_columns=cross_columns)
+
+    # 2-4. Reuse from the store, or prompt + call LLM + parse
+    suggestions, _, _ = suggest_from_profile(
+        prof,
+        model=model,
+        task=task,
+        target=target,
+        exclude_columns=exclude_columns,
+        store=store,
+        similarity_threshold=similarity_threshold,
+        seed_threshold=seed_threshold,
+        force_regenerate=force_regenerate,
+    )
+    return suggestions
+
+def suggest_from_profile(
+    prof: dict[str, Any],
+    model: str = "llama3.2",
+    task: str = "unspecified",
+    target: Optional[str] = None,
+    exclude_columns: Optional[list[str]] = None,
+    store: Optional[SuggestionStore] = None,
+    similarity_threshold: float = 0.9,
+    seed_threshold: float = 0.5,
+    force_regenerate: bool = False,
+    keep_alive: str | int | None = None,
+) -> tuple[list[Suggestion], Optional[StoreMatch], str]:
+    """
+    Generate suggestions for an existing profile, reusing a suggestion store if given.
+
+    With a store, a known dataset whose schema similarity is at least
+    `similarity_threshold` has its suggestions reused (dropping any that reference
+    missing columns) without calling the LLM. A match above `seed_threshold` is
+    passed to the LLM as a starting point instead. New results are added to the store.
+
+    Returns:
+        (suggestions, store match or None, mode) where mode is "reused", "seeded" or "generated".
+    """
+    match = None
+    seed = None
+    if store is not None and not force_regenerate:
+        match = store.lookup(prof, model, task, target, exclude_columns, min_similarity=min(seed_threshold, similarity_threshold))
+        if match is not None:
+            adapted = adapt_suggestions(match.suggestions, prof, exclude_columns)
+            if match.similarity >= similarity_threshold and adapted:
+                return adapted, match, "reused"
+            seed = [s.model_dump() for s in adapted] or None
 
-    # 2. Build the prompt
     suggest_prompt = build_suggest_prompt(
         prof, 
         task=task, 
         target=target, 
-        exclude_columns=exclude_columns
+        exclude_columns=exclude_columns,
+        seed_suggestions=seed
     )
 
-    # 3. Call LLM
     raw = generate_text(
         model=model, 
         prompt=suggest_prompt, 
         temperature=0.3, 
-        num_predict=2500
+        num_predict=2500,
+        keep_alive=keep_alive
     )
 
-    # 4. Parse response
     suggestions = parse_suggestions(raw)
-    return suggestions
+    if store is not None:
+        store.add(prof, model, task, target, suggestions, exclude_columns)
+    return suggestions, match, "seeded" if seed else "generated"
 
 def chat_continuous(
         initial_prompt : str = None,
@@ -1,16 +1,20 @@
 from __future__ import annotations
 import argparse
-import json
 import os
 import sys
 import time
+from typing import Optional
 
 from .csv_loader import load_csv
 from .profile import profile_df
-from .prompts import build_suggest_prompt, build_chat_prompt
-from .ollama_client import generate_text
-from .parsing import parse_suggestions, Suggestion
+from .prompts import build_chat_prompt
+from .ollama_client import generate_text, warmup_model, start_warmup, set_host, PRIORITY_INTERACTIVE
+from .parsing import Suggestion
 from .session import SessionState
+from .suggestion_store import SuggestionStore
+from .prefetch import ExplanationPrefetcher
+from .api import suggest_from_profile
+from .snapshot import SnapshotWriter, load_snapshot, is_snapshot, iter_records, session_records, write_export
 
 
 def _print_suggestions(suggestions: list[Suggestion], limit: int = 10) -> None:
@@ -25,9 +29,38 @@ def _print_suggestions(suggestions: list[Suggestion], limit: int = 10) -> None:
         print("=" * 60)
 
 
+def _explain_message(idx: int, s: Suggestion) -> str:
+    return (
+        f"Explain suggestion #{idx} in detail and give a short pandas/sklearn implementation plan.\n"
+        f"Suggestion object: {s.model_dump()}"
+    )
+
+
+def _start_prefetch(session: SessionState, n: int, keep_alive) -> ExplanationPrefetcher:
+    """Speculatively generate the detail explanations for the top `n` suggestions."""
+    suggestions_jsonable = [s.model_dump() for s in session.suggestions]
+    base = list(session.history)
+    prompts = []
+    for idx, s in enumerate(session.suggestions[:n], start=1):
+        # same prompt the chat loop builds if the number is the next message
+        prompts.append((idx, build_chat_prompt(
+            profile=session.profile,
+            suggestions_jsonable=suggestions_jsonable,
+            history=base + [{"role": "user", "content": str(idx)}],
+            user_message=_explain_message(idx, s),
+        )))
+    return ExplanationPrefetcher(
+        session.model, prompts, temperature=0.4, num_predict=900, keep_alive=keep_alive, based_on=base
+    ).start()
+
+
 def run_command(args: argparse.Namespace) -> int:
+    # Load the model while we read and profile the CSV
+    if not args.no_warmup:
+        start_warmup(args.model, keep_alive=args.keep_alive)
+
     df = load_csv(args.csv_path)
-    prof = profile_df(df)
+    prof = profile_df(df, target=args.target, cross_columns=args.cross_columns, top_k=args.top_k)
 
     task = args.task
     target = args.target
@@ -41,10 +74,22 @@ def run_command(args: argparse.Namespace) -> int:
     exclude_cols = [c.strip() for c in args.exclude.split(",")] if args.exclude else []
 
     # 1) Suggest phase
-    suggest_prompt = build_suggest_prompt(prof, task=task, target=target, exclude_columns=exclude_cols)
-    raw = generate_text(model=args.model, prompt=suggest_prompt, temperature=0.3, num_predict=2500)
-
-    suggestions = parse_suggestions(raw)
+    store = SuggestionStore(args.store) if args.store else None
+    suggestions, match, mode = suggest_from_profile(
+        prof,
+        model=args.model,
+        task=task,
+        target=target,
+        exclude_columns=exclude_cols,
+        store=store,
+        similarity_threshold=args.similarity,
+        force_regenerate=args.regenerate,
+        keep_alive=args.keep_alive,
+    )
+    if mode == "reused":
+        print(f"Reused suggestions from a similar dataset (similarity {match.similarity:.2f}). Use --regenerate to ask the model again.")
+    elif mode == "seeded":
+        print(f"Seeded the prompt with suggestions from a similar dataset (similarity {match.similarity:.2f}).")
     _print_suggestions(suggestions, limit=args.limit)
 
     # save initial session (optional)
@@ -58,7 +103,40 @@ def run_command(args: argparse.Namespace) -> int:
         history=[],
     )
 
+    writer = SnapshotWriter.create(args.save, session) if args.save else None
+
     # 2) Chat phase
+    _chat_loop(session, args, writer=writer)
+    return 0
+
+
+def _export(session: SessionState, writer: Optional[SnapshotWriter]) -> None:
+    timestamp = int(time.time())
+    filename = f"tyme_export_{timestamp}.txt"
+    os.makedirs("example", exist_ok=True)
+    path = os.path.join("example", filename)
+
+    # stream from the snapshot on disk when there is one
+    records = iter_records(writer.path) if writer is not None else session_records(session)
+    try:
+        write_export(records, path)
+        print(f"\nSuccessfully exported session to: {path}")
+    except Exception as e:
+        print(f"\nFailed to export session: {e}")
+
+
+def _chat_loop(
+    session: SessionState,
+    args: argparse.Namespace,
+    writer: Optional[SnapshotWriter] = None,
+) -> None:
+    def prefetch() -> Optional[ExplanationPrefetcher]:
+        # use idle model time while the user reads the list / the last answer
+        if args.prefetch <= 0:
+            return None
+        return _start_prefetch(session, min(args.prefetch, args.limit), args.keep_alive)
+
+    prefetcher = prefetch()
     print("\nChat mode: ask questions about the suggestions. Type 'export' to save, 'exit' to quit.")
     while True:
         try:
@@ -72,88 +150,120 @@ def run_command(args: argparse.Namespace) -> int:
         if user_in.lower() in {"exit", "quit"}:
             break
         if user_in.lower() == "export":
-            # Generate content
-            lines = []
-            lines.append(f"Top {len(session.suggestions)} suggestions:")
-            lines.append("=" * 60)
-            for i, s in enumerate(session.suggestions, start=1):
-                lines.append(f"\nSuggestion {i}: {s.name}")
-                lines.append(f"  Type: {s.feature_type} | Risk: {s.risk}")
-                lines.append("-" * 60)
-                lines.append(f"  Why: {s.why.strip()}")
-                lines.append(f"  How: {s.how.strip()}")
-                lines.append("=" * 60)
-
-            lines.append("\n\nChat History:")
-            lines.append("=" * 60)
-            for msg in session.history:
-                role = msg["role"].upper()
-                content = msg["content"]
-                lines.append(f"\n[{role}]\n{content}")
-                lines.append("-" * 40)
-            
-            # Write to file
-            timestamp = int(time.time())
-            filename = f"tyme_export_{timestamp}.txt"
-            os.makedirs("example", exist_ok=True)
-            path = os.path.join("example", filename)
-            
-            try:
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write("\n".join(lines))
-                print(f"\nSuccessfully exported session to: {path}")
-            except Exception as e:
-                print(f"\nFailed to export session: {e}")
-            
+            _export(session, writer)
             continue
 
         # If user types just a number, expand it
+        cached = None
         if user_in.isdigit():
             idx = int(user_in)
             if 1 <= idx <= len(session.suggestions):
-                s = session.suggestions[idx - 1]
-                user_msg = (
-                    f"Explain suggestion #{idx} in detail and give a short pandas/sklearn implementation plan.\n"
-                    f"Suggestion object: {s.model_dump()}"
-                )
+                user_msg = _explain_message(idx, session.suggestions[idx - 1])
+                # only valid if built on exactly the conversation so far
+                if prefetcher is not None and prefetcher.based_on == session.history:
+                    cached = prefetcher.get(idx)
             else:
                 user_msg = f"The user entered {idx} but it's out of range. Ask them to pick 1..{len(session.suggestions)}."
         else:
             user_msg = user_in
 
-        session.history.append({"role": "user", "content": user_in})
+        # stop speculating so the model answers this first
+        if prefetcher is not None:
+            prefetcher.cancel()
 
-        suggestions_jsonable = [s.model_dump() for s in session.suggestions]
-        chat_prompt = build_chat_prompt(
-            profile=session.profile,
-            suggestions_jsonable=suggestions_jsonable,
-            history=session.history,
-            user_message=user_msg,
-        )
+        session.history.append({"role": "user", "content": user_in})
 
-        ans = generate_text(model=session.model, prompt=chat_prompt, temperature=0.4, num_predict=900).strip()
+        if cached is not None:
+            ans = cached
+        else:
+            suggestions_jsonable = [s.model_dump() for s in session.suggestions]
+            chat_prompt = build_chat_prompt(
+                profile=session.profile,
+                suggestions_jsonable=suggestions_jsonable,
+                history=session.history,
+                user_message=user_msg,
+            )
+            ans = generate_text(model=session.model, prompt=chat_prompt, temperature=0.4, num_predict=900, keep_alive=args.keep_alive, priority=PRIORITY_INTERACTIVE).strip()
         print(f"\nAssistant: {ans}\n")
 
         session.history.append({"role": "assistant", "content": ans})
+        if writer is not None:
+            writer.append(*session.history[-2:])
+        prefetcher = prefetch()
+
+    if prefetcher is not None:
+        prefetcher.cancel()
+    if writer is not None:
+        print(f"Saved session to: {writer.path}")
+
 
-    # optional save
+def resume_command(args: argparse.Namespace) -> int:
+    session = load_snapshot(args.session_path)
+    if args.model:
+        session.model = args.model
+    start_warmup(session.model, keep_alive=args.keep_alive)
+
+    print(f"Resumed: {args.session_path} ({session.csv_path}, {len(session.history)} messages)")
+    if session.target:
+        print(f"Target: {session.target}")
+    print(f"Model: {session.model}\n")
+    _print_suggestions(session.suggestions, limit=args.limit)
+
+    # Rewrite the snapshot once (compacting it and dropping any truncated trailing
+    # write), then keep appending. Legacy JSON saves are converted next to the original.
     if args.save:
-        payload = {
-            "csv_path": session.csv_path,
-            "model": session.model,
-            "task": session.task,
-            "target": session.target,
-            "profile": session.profile,
-            "suggestions": [s.model_dump() for s in session.suggestions],
-            "history": session.history,
-        }
-        with open(args.save, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        print(f"Saved session to: {args.save}")
+        save_path = args.save
+    elif is_snapshot(args.session_path):
+        save_path = args.session_path
+    else:
+        save_path = os.path.splitext(args.session_path)[0] + ".tyme"
+        if os.path.exists(save_path):
+            save_path = f"{os.path.splitext(args.session_path)[0]}_{int(time.time())}.tyme"
+    writer = SnapshotWriter.create(save_path, session)
+    if save_path != args.session_path:
+        print(f"Saving this session to: {save_path}")
+
+    _chat_loop(session, args, writer=writer)
+    return 0
+
 
+def warmup_command(args: argparse.Namespace) -> int:
+    t0 = time.time()
+    try:
+        warmup_model(args.model, keep_alive=args.keep_alive)
+    except Exception as e:
+        print(f"Failed to warm up {args.model}: {e}")
+        return 1
+    print(f"Model {args.model} loaded in {time.time() - t0:.1f}s (keep_alive={args.keep_alive})")
     return 0
 
 
+def serve_command(args: argparse.Namespace) -> int:
+    from .server import run_server
+
+    if args.ollama_host:
+        set_host(args.ollama_host)
+    store = SuggestionStore(args.store) if args.store else None
+    run_server(
+        host=args.host,
+        port=args.port,
+        model=args.model,
+        workers=args.workers,
+        max_profiles=args.max_profiles,
+        max_sessions=args.max_sessions,
+        store=store,
+    )
+    return 0
+
+
+def _keep_alive(value: str) -> str | int:
+    # Ollama accepts durations ("10m") or seconds (-1 = keep forever)
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
 def main() -> None:
     p = argparse.ArgumentParser(prog="tyme-fe", description="CSV -> profiling -> LLM suggestions -> chat")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -165,9 +275,42 @@ def main() -> None:
     runp.add_argument("--task", default="unspecified", choices=["classification", "regression", "unspecified"], help="Task type")
     runp.add_argument("--limit", type=int, default=10, help="How many suggestions to print initially")
     runp.add_argument("--exclude", default=None, help="Comma-separated list of columns to exclude from suggestions")
-    runp.add_argument("--save", default=None, help="Save session JSON to a file path")
+    runp.add_argument("--save", default=None, help="Save the session as a compact snapshot (e.g. session.tyme); updated after every chat turn")
+    runp.add_argument("--cross-columns", action="store_true", help="Add top correlated pairs and target associations to the profile")
+    runp.add_argument("--top-k", type=int, default=10, help="How many correlated pairs / target-related columns to keep")
+    runp.add_argument("--store", default=None, help="Suggestion store file (JSON lines) for reusing suggestions across similar datasets")
+    runp.add_argument("--similarity", type=float, default=0.9, help="Minimum schema similarity (0-1) to reuse stored suggestions")
+    runp.add_argument("--regenerate", action="store_true", help="Ignore stored suggestions and ask the model again")
+    runp.add_argument("--prefetch", type=int, default=0, help="Speculatively generate explanations for the top N suggestions while you read them")
+    runp.add_argument("--keep-alive", type=_keep_alive, default="10m", help="How long Ollama keeps the model loaded (e.g. 10m, -1 for forever)")
+    runp.add_argument("--no-warmup", action="store_true", help="Do not load the model in the background while profiling")
     runp.set_defaults(func=run_command)
 
+    resp = sub.add_parser("resume", help="Resume a saved session straight into chat (no CSV or LLM work)")
+    resp.add_argument("session_path", help="Path to a session snapshot (or a legacy --save JSON file)")
+    resp.add_argument("--model", default=None, help="Override the session's Ollama model")
+    resp.add_argument("--limit", type=int, default=10, help="How many suggestions to print")
+    resp.add_argument("--prefetch", type=int, default=0, help="Speculatively generate explanations for the top N suggestions while you read them")
+    resp.add_argument("--save", default=None, help="Write the resumed session to a new snapshot instead of appending to the original")
+    resp.add_argument("--keep-alive", type=_keep_alive, default="10m", help="How long Ollama keeps the model loaded (e.g. 10m, -1 for forever)")
+    resp.set_defaults(func=resume_command)
+
+    warmp = sub.add_parser("warmup", help="Load a model into Ollama ahead of time")
+    warmp.add_argument("--model", default="llama3.2", help="Ollama model name (e.g. llama3.2, gemma3)")
+    warmp.add_argument("--keep-alive", type=_keep_alive, default="10m", help="How long Ollama keeps the model loaded (e.g. 10m, -1 for forever)")
+    warmp.set_defaults(func=warmup_command)
+
+    servep = sub.add_parser("serve", help="Run an HTTP service with profile, suggest and chat endpoints")
+    servep.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    servep.add_argument("--port", type=int, default=8765, help="Port to bind")
+    servep.add_argument("--model", default="llama3.2", help="Default Ollama model name")
+    servep.add_argument("--workers", type=int, default=2, help="Worker processes for CSV loading and profiling")
+    servep.add_argument("--max-profiles", type=int, default=16, help="How many dataset profiles to keep in memory")
+    servep.add_argument("--max-sessions", type=int, default=256, help="How many chat sessions to keep in memory")
+    servep.add_argument("--store", default=None, help="Suggestion store file (JSON lines) shared by all requests")
+    servep.add_argument("--ollama-host", default=None, help="Ollama server URL (default: OLLAMA_HOST or localhost:11434)")
+    servep.set_defaults(func=serve_command)
+
     args = p.parse_args()
     rc = args.func(args)
     raise SystemExit(rc)
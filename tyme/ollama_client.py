@@ -1,21 +1,246 @@
 from __future__ import annotations
-from typing import Optional
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Union
 import ollama
 
 
+KeepAlive = Union[str, int, float]
+
+# Lower value = served first. Chat turns jump ahead of suggestion generation.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class _RequestScheduler:
+    """
+    Single-flight + priority admission for LLM calls inside this process.
+
+    Identical in-flight generate requests (same model, prompt hash and options)
+    share one upstream call. At most `max_batch` batch-priority calls (suggestion
+    generation, prefetching) run at a time, so they can't fill Ollama's queue
+    ahead of a chat turn; interactive calls are only bound by `max_concurrent`,
+    the cap on all calls (generate or stream). Waiting callers are admitted in
+    priority order, FIFO within a priority. 0 means no limit.
+    """
+
+    def __init__(self, max_concurrent: int = 0, max_batch: int = 1):
+        self.max_concurrent = max(0, max_concurrent)
+        self.max_batch = max(0, max_batch)
+        self._cond = threading.Condition()
+        self._waiting: list[list] = []  # heap of [priority, seq] tickets
+        self._active = 0
+        self._active_batch = 0
+        self._inflight: dict[tuple, tuple[Future, list]] = {}
+        self._seq = itertools.count()
+
+    def set_limit(self, n: int, batch: Optional[int] = None) -> None:
+        with self._cond:
+            self.max_concurrent = max(0, n)
+            if batch is not None:
+                self.max_batch = max(0, batch)
+            self._cond.notify_all()
+
+    def _fits(self, priority: int) -> bool:
+        if self.max_concurrent and self._active >= self.max_concurrent:
+            return False
+        if priority >= PRIORITY_BATCH and self.max_batch and self._active_batch >= self.max_batch:
+            return False
+        return True
+
+    @contextmanager
+    def slot(self, priority: int, ticket: Optional[list] = None) -> Iterator[None]:
+        """Hold a scheduler slot for the duration of the block."""
+        with self._cond:
+            if ticket is None:
+                ticket = [priority, next(self._seq)]
+            heapq.heappush(self._waiting, ticket)
+            # ticket[0] may be raised while waiting (see run), so re-read it
+            while not (self._waiting[0] is ticket and self._fits(ticket[0])):
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            batch = ticket[0] >= PRIORITY_BATCH
+            self._active += 1
+            self._active_batch += batch
+            self._cond.notify_all()  # the next ticket may fit as well
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._active_batch -= batch
+                self._cond.notify_all()
+
+    def run(self, key: tuple, fn: Callable[[], str], priority: int) -> str:
+        with self._cond:
+            entry = self._inflight.get(key)
+            if entry is not None:
+                fut, ticket = entry
+                if priority < ticket[0] and ticket in self._waiting:
+                    # a more urgent caller joined a queued request: move it up
+                    ticket[0] = priority
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+            else:
+                fut, ticket = Future(), [priority, next(self._seq)]
+                self._inflight[key] = (fut, ticket)
+        if entry is not None:
+            return fut.result()
+
+        try:
+            with self.slot(priority, ticket):
+                result = fn()
+        except BaseException as e:
+            with self._cond:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._cond:
+            self._inflight.pop(key, None)
+        fut.set_result(result)
+        return result
+
+
+def _env_limit(names: tuple[str, ...], default: int) -> int:
+    for var in names:
+        value = os.environ.get(var)
+        if value and value.strip().isdigit():
+            return int(value)
+    return default
+
+
+# overall cap: explicit override, else mirror the server's parallelism if known, else
+# none; batch work defaults to one call at a time so chat turns are never stuck
+# behind a queue of suggestion runs and prefetches
+_scheduler = _RequestScheduler(
+    max_concurrent=_env_limit(("TYME_LLM_CONCURRENCY", "OLLAMA_NUM_PARALLEL"), 0),
+    max_batch=_env_limit(("TYME_LLM_BATCH_CONCURRENCY",), 1),
+)
+
+
+_client: Optional[ollama.Client] = None
+
+
+def set_host(host: Optional[str]) -> None:
+    """Send requests to `host` (e.g. a stand-in server in tests) instead of OLLAMA_HOST."""
+    global _client
+    _client = ollama.Client(host=host) if host else None
+
+
+def _ollama() -> Any:
+    return _client if _client is not None else ollama
+
+
+def set_max_concurrency(n: int, batch: Optional[int] = None) -> None:
+    """
+    How many LLM calls this process sends to Ollama at once (0 = no limit), and
+    optionally how many of those may be batch-priority calls (default 1).
+    Match `n` to the server's OLLAMA_NUM_PARALLEL; extra requests wait in the
+    priority queue.
+    """
+    _scheduler.set_limit(n, batch)
+
+
+def _call_generate(model: str, prompt: str, options: dict[str, Any], keep_alive: Optional[KeepAlive]) -> str:
+    resp = _ollama().generate(
+        model=model,
+        prompt=prompt,
+        options=options,
+        keep_alive=keep_alive,
+    )
+    # ollama python lib typically returns {'response': '...'}
+    return resp.get("response", "")
+
+
 def generate_text(
     model: str,
     prompt: str,
     temperature: float = 0.3,
     num_predict: int = 900,
+    keep_alive: Optional[KeepAlive] = None,
+    priority: int = PRIORITY_BATCH,
 ) -> str:
-    resp = ollama.generate(
+    options = {
+        "temperature": temperature,
+        "num_predict": num_predict,
+    }
+    key = (model, hashlib.sha256(prompt.encode("utf-8")).hexdigest(), tuple(sorted(options.items())))
+    return _scheduler.run(
+        key,
+        lambda: _call_generate(model=model, prompt=prompt, options=options, keep_alive=keep_alive),
+        priority,
+    )
+
+
+def stream_text(
+    model: str,
+    prompt: str,
+    temperature: float = 0.3,
+    num_predict: int = 900,
+    keep_alive: Optional[KeepAlive] = None,
+    priority: int = PRIORITY_BATCH,
+) -> Iterator[str]:
+    """
+    Yield response chunks as Ollama produces them. Closing the iterator early
+    drops the connection, which makes Ollama stop generating. Streams wait for
+    a scheduler slot like generate_text but are never coalesced.
+    """
+    with _scheduler.slot(priority):
+        yield from _stream(model, prompt, temperature, num_predict, keep_alive)
+
+
+def _stream(
+    model: str,
+    prompt: str,
+    temperature: float,
+    num_predict: int,
+    keep_alive: Optional[KeepAlive],
+) -> Iterator[str]:
+    stream = _ollama().generate(
         model=model,
         prompt=prompt,
         options={
             "temperature": temperature,
             "num_predict": num_predict,
         },
+        keep_alive=keep_alive,
+        stream=True,
     )
-    # ollama python lib typically returns {'response': '...'}
-    return resp.get("response", "")
+    try:
+        for part in stream:
+            yield part.get("response", "")
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def warmup_model(model: str, keep_alive: KeepAlive = "10m") -> None:
+    """
+    Load `model` into the Ollama server's memory without generating anything.
+    An empty prompt makes Ollama load the weights and return immediately.
+    """
+    _ollama().generate(model=model, prompt="", keep_alive=keep_alive)
+
+
+def start_warmup(model: str, keep_alive: KeepAlive = "10m") -> threading.Thread:
+    """
+    Run `warmup_model` in a daemon thread so the model loads while the caller
+    keeps working (loading the CSV, profiling, ...). Errors are swallowed here:
+    the real generation request will report them.
+    """
+
+    def _run() -> None:
+        try:
+            warmup_model(model, keep_alive=keep_alive)
+        except Exception:
+            pass
+
+    t = threading.Thread(target=_run, name=f"tyme-warmup-{model}", daemon=True)
+    t.start()
+    return t
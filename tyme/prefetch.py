@@ -0,0 +1,94 @@
+from __future__ import annotations
+import threading
+from concurrent.futures import Future
+from typing import Any, Hashable, Optional
+
+from .ollama_client import stream_text, KeepAlive
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class ExplanationPrefetcher:
+    """
+    Speculatively generates answers for prompts the user is likely to send next
+    (e.g. "explain suggestion #3"), one at a time in a background thread, and
+    keeps them for the rest of the session.
+
+    `cancel()` stops the prefetch: prompts not started yet are dropped and the
+    one being generated is aborted, so the model is free for the user's own
+    question. Answers that already finished stay available. Prefetch streams run
+    at batch priority in the request scheduler.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        prompts: list[tuple[Hashable, str]],
+        temperature: float = 0.4,
+        num_predict: int = 900,
+        keep_alive: Optional[KeepAlive] = None,
+        based_on: Any = None,
+    ):
+        # snapshot of the state the prompts were built from (e.g. the chat
+        # history); callers compare it before trusting an answer
+        self.based_on = based_on
+        self.model = model
+        self.temperature = temperature
+        self.num_predict = num_predict
+        self.keep_alive = keep_alive
+        self._prompts = prompts
+        self._futures: dict[Hashable, Future] = {key: Future() for key, _ in prompts}
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ExplanationPrefetcher":
+        self._thread = threading.Thread(target=self._run, name="tyme-prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        for fut in self._futures.values():
+            fut.cancel()  # no-op for running / finished ones
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        The prefetched answer for `key`, waiting if it is being generated right
+        now. Returns None if it was never prefetched, not started yet, cancelled
+        or failed; the caller should then generate it itself.
+        """
+        fut = self._futures.get(key)
+        if fut is None or fut.cancel():
+            return None
+        try:
+            return fut.result()
+        except Exception:
+            return None
+
+    def _run(self) -> None:
+        for key, prompt in self._prompts:
+            if self._cancel.is_set():
+                break
+            fut = self._futures[key]
+            if not fut.set_running_or_notify_cancel():
+                continue
+            stream = stream_text(
+                model=self.model,
+                prompt=prompt,
+                temperature=self.temperature,
+                num_predict=self.num_predict,
+                keep_alive=self.keep_alive,
+            )
+            try:
+                parts = []
+                for chunk in stream:
+                    if self._cancel.is_set():
+                        raise _Cancelled()
+                    parts.append(chunk)
+                fut.set_result("".join(parts).strip())
+            except Exception as e:
+                fut.set_exception(e)
+            finally:
+                stream.close()
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Optional
+import heapq
 import numpy as np
 import pandas as pd
 import warnings
@@ -10,26 +11,68 @@ from pandas.api.types import (
 )
 
 
-def _infer_col_type(s: pd.Series) -> str:
+# Candidate formats for object columns, tried in order (ties go to the earlier one)
+_DATETIME_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%d.%m.%Y",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%d-%m-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%Y-%m",
+    "ISO8601",
+]
+
+
+def _detect_datetime_format(sample: pd.Series) -> Optional[str]:
+    """
+    Find an explicit format that parses more than 90% of `sample`.
+    Runs once per column per profile pass; the result is handed to `_datetime_stats`.
+    """
+    # cheap pre-check: dates contain digits, so a mostly digit-free sample can't pass
+    if sample.str.contains(r"\d", regex=True).mean() <= 0.9:
+        return None
+    for fmt in _DATETIME_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+        if parsed.notna().mean() > 0.9:
+            return fmt
+    return None
+
+
+def _infer_col_type_and_format(s: pd.Series) -> tuple[str, Optional[str]]:
     if is_bool_dtype(s):
-        return "categorical"
+        return "categorical", None
     if is_datetime64_any_dtype(s):
-        return "datetime"
+        return "datetime", None
     if is_numeric_dtype(s):
-        return "numeric"
+        return "numeric", None
 
     # object/string: decide categorical vs text vs datetime-ish
     s2 = s.dropna().astype(str)
     if len(s2) == 0:
-        return "unknown"
+        return "unknown", None
 
-    # try datetime parse on a small sample
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", UserWarning)
-        sample = s2.sample(min(50, len(s2)), random_state=0)
-        parsed = pd.to_datetime(sample, errors="coerce", utc=False)
-    if parsed.notna().mean() > 0.9:
-        return "datetime"
+    # work out a datetime format on a small sample
+    sample = s2.sample(min(50, len(s2)), random_state=0)
+    fmt = _detect_datetime_format(sample)
+    if fmt is not None:
+        return "datetime", fmt
 
     nunique = s2.nunique(dropna=True)
     unique_ratio = nunique / max(len(s2), 1)
@@ -37,20 +80,351 @@ def _infer_col_type(s: pd.Series) -> str:
 
     # heuristics
     if unique_ratio < 0.2:
-        return "categorical"
+        return "categorical", None
     if avg_len >= 30 and unique_ratio > 0.5:
-        return "text"
-    return "categorical"
+        return "text", None
+    return "categorical", None
+
+
+def _infer_col_type(s: pd.Series) -> str:
+    return _infer_col_type_and_format(s)[0]
+
+
+def _datetime_granularity(dt: pd.Series) -> str:
+    """Coarsest calendar unit that all timestamps are aligned to."""
+    if (dt.dt.microsecond != 0).any() or (dt.dt.second != 0).any():
+        return "second"
+    if (dt.dt.minute != 0).any():
+        return "minute"
+    if (dt.dt.hour != 0).any():
+        return "hour"
+    if (dt.dt.day != 1).any():
+        return "day"
+    if (dt.dt.month != 1).any():
+        return "month"
+    return "year"
+
+
+def _datetime_stats(non_null: pd.Series, fmt: Optional[str]) -> Optional[dict[str, Any]]:
+    """
+    Stats for a datetime column: range, granularity and weekday/hour distribution.
+    The whole column is parsed in one vectorized call using the detected format.
+    """
+    if is_datetime64_any_dtype(non_null):
+        dt = non_null
+    else:
+        dt = pd.to_datetime(non_null.astype(str), format=fmt, errors="coerce")
+    dt = dt.dropna()
+    if not len(dt):
+        return None
+
+    lo, hi = dt.min(), dt.max()
+    granularity = _datetime_granularity(dt)
+    uniq = pd.Series(dt.unique()).sort_values()
+    gaps = uniq.diff().dropna()
+
+    weekdays = dt.dt.dayofweek.value_counts(normalize=True).sort_index()
+    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+    stats: dict[str, Any] = {
+        "min": lo.isoformat(),
+        "max": hi.isoformat(),
+        "span_days": round((hi - lo).total_seconds() / 86400, 2),
+        "granularity": granularity,
+        "median_gap": str(gaps.median()) if len(gaps) else None,
+        "parsed_ratio": round(len(dt) / len(non_null), 4),
+        "weekday_distribution": {day_names[int(k)]: round(float(v), 3) for k, v in weekdays.items()},
+    }
+    if fmt is not None:
+        stats["format"] = fmt
+    if granularity in ("hour", "minute", "second"):
+        hours = dt.dt.hour.value_counts(normalize=True).sort_index()
+        stats["hour_distribution"] = {int(k): round(float(v), 3) for k, v in hours.items()}
+    return stats
+
+
+def _prepare_block(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split a float matrix into (values, mask), treating NaN and +/-inf as missing.
+    Values are z-scored on the column's own present rows (for numerical
+    stability only, correlations are re-centred on pairwise-complete rows later)
+    and missing cells set to 0; the mask is 1 where a value is present.
+    """
+    M = np.isfinite(X)
+    X = np.where(M, X, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(X, axis=0)
+        std = np.nanstd(X, axis=0)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    Z = np.where(M, (X - np.nan_to_num(mean)) / std, 0.0)
+    return Z.astype(np.float32), M.astype(np.float32)
+
+
+def _pairwise_pearson(
+    Za: np.ndarray, Ma: np.ndarray, Zb: np.ndarray, Mb: np.ndarray
+) -> np.ndarray:
+    """
+    Pearson correlation between every column of block a and every column of
+    block b, each pair using only the rows where both are present (like
+    `DataFrame.corr`). Everything is a matrix product over the two blocks.
+    """
+    if Ma.all() and Mb.all():
+        # no missing values: z-scores are already on the shared rows
+        return np.clip((Za.T @ Zb) / Za.shape[0], -1.0, 1.0).astype(np.float64)
+
+    Za, Ma, Zb, Mb = (x.astype(np.float64) for x in (Za, Ma, Zb, Mb))
+    n = Ma.T @ Mb
+    sa = Za.T @ Mb
+    sb = Ma.T @ Zb
+    saa = (Za * Za).T @ Mb
+    sbb = Ma.T @ (Zb * Zb)
+    sab = Za.T @ Zb
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sab - sa * sb
+        var = (n * saa - sa * sa) * (n * sbb - sb * sb)
+        r = cov / np.sqrt(var)
+    r = np.where(np.isfinite(r) & (n >= 3) & (var > 1e-12 * n**4), r, 0.0)
+    return np.clip(r, -1.0, 1.0)
+
+
+def _numeric_block(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """Columns as a float matrix; non-numeric and infinite values become NaN."""
+    X = np.column_stack(
+        [pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan) for c in cols]
+    )
+    return np.where(np.isfinite(X), X, np.nan)
+
 
+def _category_codes(s: pd.Series, max_levels: int) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """
+    Integer codes for a categorical series (missing values get their own level).
+    Returns None when the column has more than `max_levels` levels.
+    """
+    codes, uniques = pd.factorize(s.astype(str).where(s.notna(), "<NA>"))
+    if len(uniques) < 2 or len(uniques) > max_levels:
+        return None
+    return codes, np.bincount(codes, minlength=len(uniques))
 
-def profile_df(df: pd.DataFrame, max_top_values: int = 3) -> dict[str, Any]:
+
+def _top_correlated_pairs(
+    df: pd.DataFrame, cols: list[str], top_k: int, block_size: int
+) -> list[dict[str, Any]]:
+    """
+    Pearson correlation (pairwise-complete) between all numeric columns, computed
+    one column block pair at a time so only block_size x block_size matrices are
+    ever materialized.
+    Only the `top_k` strongest pairs (by |r|) are kept.
+    """
+    n = len(df)
+    if n < 3 or len(cols) < 2:
+        return []
+
+    blocks = [cols[i : i + block_size] for i in range(0, len(cols), block_size)]
+    # prepare each block once; float32 halves memory, products run in float64 per block pair
+    P = [_prepare_block(_numeric_block(df, b)) for b in blocks]
+    best: list[tuple[float, str, str, float]] = []
+
+    for bi, cols_i in enumerate(blocks):
+        for bj in range(bi, len(blocks)):
+            cols_j = blocks[bj]
+            C = _pairwise_pearson(*P[bi], *P[bj])
+            A = np.abs(C)
+            A[~np.isfinite(A)] = 0.0  # never let a NaN pair into the ranking
+            if bj == bi:
+                # keep the strict upper triangle only (no self / duplicate pairs)
+                A = np.triu(A, k=1)
+            flat = A.ravel()
+            k = min(top_k, flat.size)
+            for idx in np.argpartition(flat, -k)[-k:]:
+                strength = float(flat[idx])
+                if not np.isfinite(strength) or strength <= 0:
+                    continue
+                a, b = divmod(int(idx), A.shape[1])
+                item = (strength, str(cols_i[a]), str(cols_j[b]), float(C[a, b]))
+                if len(best) < top_k:
+                    heapq.heappush(best, item)
+                else:
+                    heapq.heappushpop(best, item)
+
+    best.sort(reverse=True)
+    return [{"a": a, "b": b, "pearson": round(r, 4)} for _, a, b, r in best]
+
+
+def _anova(
+    X: np.ndarray, codes: np.ndarray, k: int, M: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One-way ANOVA of every column of X grouped by `codes` (values in 0..k-1).
+    With a mask M, each column only uses its non-missing rows (X must be 0 there).
+    Returns (F statistic, correlation ratio eta) per column.
+    """
+    n = X.shape[0]
+    if M is None:
+        M = np.ones_like(X)
+    G = np.zeros((n, k))
+    G[np.arange(n), codes] = 1.0
+
+    X = X.astype(np.float64)
+    counts = G.T @ M  # k x p, rows per group and column
+    sums = G.T @ X
+    n_col = counts.sum(axis=0)
+    total = sums.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correction = np.where(n_col > 0, total**2 / n_col, 0.0)
+        ss_between = np.where(counts > 0, sums**2 / counts, 0.0).sum(axis=0) - correction
+        ss_total = (X * X).sum(axis=0) - correction
+    ss_between = np.maximum(ss_between, 0.0)
+    ss_within = np.maximum(ss_total - ss_between, 0.0)
+
+    groups = (counts > 0).sum(axis=0)
+    df_b = np.maximum(groups - 1, 1)
+    df_w = np.maximum(n_col - groups, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (ss_between / df_b) / (ss_within / df_w)
+        eta = np.sqrt(ss_between / ss_total)
+    valid = (groups >= 2) & (n_col >= 3)
+    f = np.where(valid & np.isfinite(f), f, 0.0)
+    eta = np.where(valid & np.isfinite(eta), np.minimum(eta, 1.0), 0.0)
+    return f, eta
+
+
+def _cramers_v(a_codes: np.ndarray, a_counts: np.ndarray, b_codes: np.ndarray, b_counts: np.ndarray) -> float:
+    ka, kb = len(a_counts), len(b_counts)
+    n = len(a_codes)
+    table = np.bincount(a_codes * kb + b_codes, minlength=ka * kb).reshape(ka, kb).astype(float)
+    expected = np.outer(a_counts, b_counts) / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi2 = np.nansum((table - expected) ** 2 / expected)
+    denom = n * (min(ka, kb) - 1)
+    return float(np.sqrt(chi2 / denom)) if denom > 0 else 0.0
+
+
+def _target_associations(
+    df: pd.DataFrame,
+    target: str,
+    target_type: str,
+    numeric_cols: list[str],
+    categorical_cols: list[str],
+    top_k: int,
+    block_size: int,
+    max_levels: int,
+) -> list[dict[str, Any]]:
+    """
+    Association of each feature with the target, scored on a common 0..1 "strength"
+    scale so the different measures can be ranked together:
+      numeric target:     |pearson| for numeric features, eta (ANOVA) for categorical ones
+      categorical target: eta (ANOVA) for numeric features, Cramer's V for categorical ones
+    """
+    df = df[df[target].notna()]
+    n = len(df)
+    if n < 3:
+        return []
+
+    out: list[dict[str, Any]] = []
+
+    if target_type == "numeric":
+        t = _numeric_block(df, [target])[:, 0]
+        Pt = _prepare_block(t[:, None])
+        for i in range(0, len(numeric_cols), block_size):
+            block = numeric_cols[i : i + block_size]
+            r = _pairwise_pearson(*_prepare_block(_numeric_block(df, block)), *Pt)[:, 0]
+            for c, v in zip(block, r):
+                out.append({"column": str(c), "method": "pearson", "value": round(float(v), 4), "strength": abs(float(v))})
+        y = np.nan_to_num(t, nan=float(np.nanmean(t)))[:, None]
+        for c in categorical_cols:
+            enc = _category_codes(df[c], max_levels)
+            if enc is None:
+                continue
+            f, eta = _anova(y, enc[0], len(enc[1]))
+            out.append({"column": str(c), "method": "anova_f", "value": round(float(f[0]), 4), "strength": float(eta[0])})
+
+    elif target_type == "categorical":
+        t_enc = _category_codes(df[target], max_levels)
+        if t_enc is None:
+            return []
+        for i in range(0, len(numeric_cols), block_size):
+            block = numeric_cols[i : i + block_size]
+            Z, M = _prepare_block(_numeric_block(df, block))
+            f, eta = _anova(Z, t_enc[0], len(t_enc[1]), M=M)
+            for c, fv, ev in zip(block, f, eta):
+                out.append({"column": str(c), "method": "anova_f", "value": round(float(fv), 4), "strength": float(ev)})
+        for c in categorical_cols:
+            enc = _category_codes(df[c], max_levels)
+            if enc is None:
+                continue
+            v = _cramers_v(*enc, *t_enc)
+            out.append({"column": str(c), "method": "cramers_v", "value": round(v, 4), "strength": v})
+
+    out = heapq.nlargest(top_k, (d for d in out if np.isfinite(d["strength"])), key=lambda d: d["strength"])
+    for d in out:
+        d["strength"] = round(d["strength"], 4)
+    return out
+
+
+def profile_cross_columns(
+    df: pd.DataFrame,
+    columns: list[dict[str, Any]],
+    target: Optional[str] = None,
+    top_k: int = 10,
+    sample_rows: int = 10_000,
+    block_size: int = 256,
+    max_levels: int = 50,
+) -> dict[str, Any]:
+    """
+    Cross-column stage of the profile: strongest numeric correlation pairs and the
+    columns most associated with `target`. Rows are sampled for large data and
+    only the top-k results are kept, so the output stays small for wide tables.
+
+    Args:
+        df: Input DataFrame.
+        columns: The per-column entries produced by `profile_df`.
+        target: Target column name (optional).
+        top_k: How many pairs / target-related columns to keep.
+        sample_rows: Maximum number of rows used for the statistics.
+        block_size: Number of columns per correlation block.
+        max_levels: Categorical columns with more levels are skipped.
+    """
+    if len(df) > sample_rows:
+        df = df.sample(sample_rows, random_state=0)
+
+    types = {c["name"]: c["inferred_type"] for c in columns}
+    names = {str(c): c for c in df.columns}
+    numeric_cols = [names[n] for n, t in types.items() if t == "numeric" and n != target]
+    categorical_cols = [names[n] for n, t in types.items() if t == "categorical" and n != target]
+
+    out: dict[str, Any] = {
+        "sampled_rows": int(len(df)),
+        "top_correlations": _top_correlated_pairs(df, numeric_cols, top_k, block_size),
+    }
+    if target is not None and target in names:
+        out["target_associations"] = _target_associations(
+            df,
+            names[target],
+            types[target],
+            numeric_cols,
+            categorical_cols,
+            top_k,
+            block_size,
+            max_levels,
+        )
+    return out
+
+
+def profile_df(
+    df: pd.DataFrame,
+    max_top_values: int = 3,
+    target: Optional[str] = None,
+    cross_columns: bool = False,
+    top_k: int = 10,
+) -> dict[str, Any]:
     n_rows, n_cols = df.shape
     cols = []
 
     for col in df.columns:
         s = df[col]
         missing = float(s.isna().mean())
-        inferred = _infer_col_type(s)
+        inferred, dt_format = _infer_col_type_and_format(s)
 
         entry: dict[str, Any] = {
             "name": str(col),
@@ -79,13 +453,21 @@ def profile_df(df: pd.DataFrame, max_top_values: int = 3) -> dict[str, Any]:
                     "std": float(np.nanstd(nn)),
                 }
 
+        if inferred == "datetime" and len(non_null):
+            dt_stats = _datetime_stats(non_null, dt_format)
+            if dt_stats is not None:
+                entry["stats"] = dt_stats
+
         if inferred == "categorical" and len(non_null):
             vc = non_null.astype(str).value_counts(dropna=True).head(max_top_values)
             entry["top_values"] = [{"value": k, "count": int(v)} for k, v in vc.items()]
 
         cols.append(entry)
 
-    return {
+    prof: dict[str, Any] = {
         "shape": {"rows": int(n_rows), "cols": int(n_cols)},
         "columns": cols,
     }
+    if cross_columns:
+        prof["cross_column"] = profile_cross_columns(df, cols, target=target, top_k=top_k)
+    return prof
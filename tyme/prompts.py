@@ -8,10 +8,26 @@ def build_suggest_prompt(
     task: str,
     target: Optional[str],
     exclude_columns: Optional[list[str]] = None,
+    seed_suggestions: Optional[list[dict[str, Any]]] = None,
 ) -> str:
     target_line = f"Target column: {target}" if target else "Target column: (not provided)"
     task_line = f"Task type: {task} (classification/regression/unspecified)"
     
+    cross_text = ""
+    if "cross_column" in profile:
+        cross_text = (
+            "- The profile's 'cross_column' section lists the most correlated numeric pairs and the columns most "
+            "associated with the target. Prefer interactions between these columns over arbitrary pairs.\n"
+        )
+
+    seed_text = ""
+    if seed_suggestions:
+        seed_text = (
+            "SUGGESTIONS FROM A DATASET WITH A SIMILAR SCHEMA (JSON):\n"
+            "Keep the ones that still fit this dataset, fix or replace the rest.\n"
+            f"{json.dumps(seed_suggestions, ensure_ascii=False)}\n\n"
+        )
+
     exclude_text = ""
     if exclude_columns:
         exclude_text = f"- Do NOT use the following columns in any suggestions: {', '.join(exclude_columns)}\n"
@@ -51,9 +67,11 @@ def build_suggest_prompt(
         "TEMPLATE EXAMPLES (Replace placeholders with ACTUAL columns):\n"
         "- Suggestion: 'Ratio_NumA_NumB'. How: 'NumA / NumB'. Why: 'Captures efficiency'.\n"
         "- Suggestion: 'Log_NumA'. How: 'log(NumA)'. Why: 'Stabilizes variance'.\n"
+        f"{cross_text}"
         f"{exclude_text}"
         "Your Output MUST be a valid JSON array of 10 suggestions obeying this exact schema:\n"
         f"{json.dumps(schema, indent=2)}\n\n"
+        f"{seed_text}"
         "FULL DATASET PROFILE (JSON):\n"
         f"{json.dumps(profile, ensure_ascii=False)}\n"
     )
@@ -0,0 +1,436 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from .api import suggest_from_profile
+from .csv_loader import load_csv
+from .ollama_client import stream_text, generate_text, PRIORITY_INTERACTIVE
+from .profile import profile_df
+from .prompts import build_chat_prompt
+from .session import SessionState
+from .suggestion_store import SuggestionStore
+
+
+_MAX_BODY = 1 << 20
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class LRUCache:
+    """Small ordered-dict LRU. Not thread-safe: only touched from the event loop."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._data: OrderedDict[str, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+
+def _load_and_profile(csv_path: str, target: Optional[str], cross_columns: bool, top_k: int) -> dict[str, Any]:
+    # runs in a worker process
+    df = load_csv(csv_path)
+    return profile_df(df, target=target, cross_columns=cross_columns, top_k=top_k)
+
+
+def _dataset_id(csv_path: str, target: Optional[str], cross_columns: bool, top_k: int) -> str:
+    # the file's mtime/size are part of the key, so an edited CSV is profiled again
+    st = os.stat(csv_path)
+    raw = f"{os.path.abspath(csv_path)}|{st.st_mtime_ns}|{st.st_size}|{target}|{cross_columns}|{top_k}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class TymeServer:
+    """
+    Asyncio HTTP service around the Tyme pipeline.
+
+    Loaded profiles and chat sessions live in in-memory LRUs, so repeated
+    requests skip re-reading and re-profiling the CSV. Profiling runs in a
+    process pool; LLM calls run in threads so the event loop stays responsive.
+
+    Endpoints (JSON bodies):
+        GET  /health
+        POST /profile  {csv_path, target?, cross_columns?, top_k?}
+        POST /suggest  {dataset_id | csv_path, model?, task?, target?, exclude_columns?, force_regenerate?}
+        POST /chat     {session_id, message, stream?}  (stream=true returns NDJSON token chunks)
+    """
+
+    def __init__(
+        self,
+        model: str = "llama3.2",
+        workers: int = 2,
+        max_profiles: int = 16,
+        max_sessions: int = 256,
+        store: Optional[SuggestionStore] = None,
+    ):
+        self.model = model
+        self.store = store
+        self.profiles = LRUCache(max_profiles)  # dataset_id -> (csv_path, target, profile)
+        self.sessions = LRUCache(max_sessions)  # session_id -> (SessionState, asyncio.Lock)
+        # workers must not be forked from the running server: they would inherit
+        # the listening socket and open client connections
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        self._profiling: dict[str, asyncio.Future] = {}
+
+    # ---- handlers -------------------------------------------------------
+
+    async def get_profile(self, csv_path: str, target: Optional[str], cross_columns: bool, top_k: int) -> tuple[str, dict[str, Any]]:
+        if not os.path.isfile(csv_path):
+            raise HTTPError(404, f"CSV not found: {csv_path}")
+        dataset_id = _dataset_id(csv_path, target, cross_columns, top_k)
+
+        cached = self.profiles.get(dataset_id)
+        if cached is not None:
+            return dataset_id, cached[2]
+
+        # concurrent requests for the same dataset wait on one profiling job
+        pending = self._profiling.get(dataset_id)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self._pool, _load_and_profile, csv_path, target, cross_columns, top_k)
+            self._profiling[dataset_id] = pending
+            try:
+                prof = await asyncio.shield(pending)
+                self.profiles.put(dataset_id, (csv_path, target, prof))
+            finally:
+                self._profiling.pop(dataset_id, None)
+            return dataset_id, prof
+        return dataset_id, await asyncio.shield(pending)
+
+    async def handle_profile(self, body: dict[str, Any]) -> dict[str, Any]:
+        csv_path = _require(body, "csv_path")
+        dataset_id, prof = await self.get_profile(
+            csv_path,
+            _str_field(body, "target"),
+            _bool_field(body, "cross_columns"),
+            _int_field(body, "top_k", 10),
+        )
+        return {"dataset_id": dataset_id, "profile": prof}
+
+    async def handle_suggest(self, body: dict[str, Any]) -> dict[str, Any]:
+        target = _str_field(body, "target")
+        exclude_columns = body.get("exclude_columns")
+        if exclude_columns is not None and not (
+            isinstance(exclude_columns, list) and all(isinstance(c, str) for c in exclude_columns)
+        ):
+            raise HTTPError(400, "Field exclude_columns must be a list of strings")
+        force_regenerate = _bool_field(body, "force_regenerate")
+        if "dataset_id" in body:
+            dataset_id = _require(body, "dataset_id")
+            cached = self.profiles.get(dataset_id)
+            if cached is None:
+                raise HTTPError(404, f"Unknown dataset_id: {dataset_id} (profile it again)")
+            csv_path, profiled_target, prof = cached
+            target = target if target is not None else profiled_target
+        else:
+            csv_path = _require(body, "csv_path")
+            dataset_id, prof = await self.get_profile(csv_path, target, _bool_field(body, "cross_columns"), _int_field(body, "top_k", 10))
+
+        model = _str_field(body, "model") or self.model
+        task = _str_field(body, "task") or "unspecified"
+        if task not in ("classification", "regression", "unspecified"):
+            raise HTTPError(400, f"Field task must be classification, regression or unspecified, not {task!r}")
+        loop = asyncio.get_running_loop()
+        suggestions, match, mode = await loop.run_in_executor(
+            None,
+            lambda: suggest_from_profile(
+                prof,
+                model=model,
+                task=task,
+                target=target,
+                exclude_columns=exclude_columns,
+                store=self.store,
+                force_regenerate=force_regenerate,
+            ),
+        )
+
+        session = SessionState(
+            csv_path=csv_path,
+            model=model,
+            task=task,
+            target=target,
+            profile=prof,
+            suggestions=suggestions,
+            history=[],
+        )
+        session_id = uuid.uuid4().hex
+        self.sessions.put(session_id, (session, asyncio.Lock()))
+        return {
+            "session_id": session_id,
+            "dataset_id": dataset_id,
+            "mode": mode,
+            "similarity": match.similarity if match is not None else None,
+            "suggestions": [s.model_dump() for s in suggestions],
+        }
+
+    def _chat_prompt(self, session: SessionState, message: str) -> str:
+        return build_chat_prompt(
+            profile=session.profile,
+            suggestions_jsonable=[s.model_dump() for s in session.suggestions],
+            history=session.history,
+            user_message=message,
+        )
+
+    async def handle_chat(self, body: dict[str, Any], writer: asyncio.StreamWriter) -> Optional[dict[str, Any]]:
+        session_id = _require(body, "session_id")
+        message = _require(body, "message")
+        stream = _bool_field(body, "stream")
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise HTTPError(404, f"Unknown session_id: {session_id}")
+        session, lock = entry
+
+        # one turn at a time per session keeps the history consistent
+        async with lock:
+            session.history.append({"role": "user", "content": message})
+            prompt = self._chat_prompt(session, message)
+
+            if not stream:
+                loop = asyncio.get_running_loop()
+                try:
+                    ans = await loop.run_in_executor(
+                        None,
+                        lambda: generate_text(model=session.model, prompt=prompt, temperature=0.4, num_predict=900, priority=PRIORITY_INTERACTIVE),
+                    )
+                except BaseException:
+                    session.history.pop()  # don't keep the unanswered question
+                    raise
+                ans = ans.strip()
+                session.history.append({"role": "assistant", "content": ans})
+                return {"session_id": session_id, "answer": ans}
+
+            await _start_chunked(writer)
+            parts = []
+            try:
+                async for token in _stream_async(session.model, prompt):
+                    parts.append(token)
+                    await _write_chunk(writer, json.dumps({"token": token}, ensure_ascii=False).encode("utf-8") + b"\n")
+                ans = "".join(parts).strip()
+                session.history.append({"role": "assistant", "content": ans})
+                await _write_chunk(writer, json.dumps({"done": True, "answer": ans}, ensure_ascii=False).encode("utf-8") + b"\n")
+            except (ConnectionError, asyncio.CancelledError):
+                session.history.pop()  # client went away: drop the unanswered question
+                raise
+            except Exception as e:
+                session.history.pop()
+                await _write_chunk(writer, json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+            await _end_chunked(writer)
+            return None
+
+    # ---- HTTP plumbing --------------------------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await _read_request(reader)
+            if path == "/health" and method == "GET":
+                payload = {"status": "ok", "profiles": len(self.profiles), "sessions": len(self.sessions)}
+            elif path in ("/profile", "/suggest", "/chat"):
+                if method != "POST":
+                    raise HTTPError(405, f"{path} only accepts POST")
+                if path == "/profile":
+                    payload = await self.handle_profile(body)
+                elif path == "/suggest":
+                    payload = await self.handle_suggest(body)
+                else:
+                    payload = await self.handle_chat(body, writer)
+            else:
+                raise HTTPError(404, f"No route for {path}")
+            if payload is not None:
+                await _send_json(writer, 200, payload)
+        except HTTPError as e:
+            await _send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            try:
+                await _send_json(writer, 500, {"error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"Tyme serving on {addrs}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+
+def _require(body: dict[str, Any], key: str) -> str:
+    if key not in body or body[key] in (None, ""):
+        raise HTTPError(400, f"Missing field: {key}")
+    if not isinstance(body[key], str):
+        raise HTTPError(400, f"Field {key} must be a string")
+    return body[key]
+
+
+def _int_field(body: dict[str, Any], key: str, default: int) -> int:
+    value = body.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise HTTPError(400, f"Field {key} must be a positive integer")
+    return value
+
+
+def _bool_field(body: dict[str, Any], key: str, default: bool = False) -> bool:
+    value = body.get(key, default)
+    if not isinstance(value, bool):
+        raise HTTPError(400, f"Field {key} must be true or false")
+    return value
+
+
+def _str_field(body: dict[str, Any], key: str) -> Optional[str]:
+    value = body.get(key)
+    if value is not None and not isinstance(value, str):
+        raise HTTPError(400, f"Field {key} must be a string")
+    return value
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, Any]]:
+    request_line = (await reader.readline()).decode("latin1").strip()
+    parts = request_line.split()
+    if len(parts) < 2:
+        raise HTTPError(400, "Malformed request line")
+    method, path = parts[0].upper(), parts[1].split("?", 1)[0]
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin1")
+        if line in ("\r\n", "\n", ""):
+            break
+        k, _, v = line.partition(":")
+        headers[k.strip().lower()] = v.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length header") from None
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length header")
+    if length > _MAX_BODY:
+        raise HTTPError(413, "Request body too large")
+    if not length:
+        return method, path, {}
+    raw = await reader.readexactly(length)
+    try:
+        body = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise HTTPError(400, f"Invalid JSON body: {e}") from e
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Expected a JSON object body")
+    return method, path, body
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict[str, Any]) -> None:
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(head.encode("latin1") + data)
+    await writer.drain()
+
+
+async def _start_chunked(writer: asyncio.StreamWriter) -> None:
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    await writer.drain()
+
+
+async def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):X}\r\n".encode("latin1") + data + b"\r\n")
+    await writer.drain()
+
+
+async def _end_chunked(writer: asyncio.StreamWriter) -> None:
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _stream_async(model: str, prompt: str):
+    """
+    Bridge the blocking `stream_text` iterator into the event loop via a thread.
+    If the consumer stops early, the thread closes the stream so Ollama stops too.
+    """
+    loop = asyncio.get_running_loop()
+    q: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def _produce() -> None:
+        stream = stream_text(model=model, prompt=prompt, temperature=0.4, num_predict=900, priority=PRIORITY_INTERACTIVE)
+        try:
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(q.put_nowait, chunk)
+            loop.call_soon_threadsafe(q.put_nowait, done)
+        except Exception as e:
+            loop.call_soon_threadsafe(q.put_nowait, e)
+        finally:
+            stream.close()
+
+    threading.Thread(target=_produce, name="tyme-chat-stream", daemon=True).start()
+    try:
+        while True:
+            item = await q.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            if item:
+                yield item
+    finally:
+        stop.set()
+
+
+def run_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    model: str = "llama3.2",
+    workers: int = 2,
+    max_profiles: int = 16,
+    max_sessions: int = 256,
+    store: Optional[SuggestionStore] = None,
+) -> None:
+    server = TymeServer(model=model, workers=workers, max_profiles=max_profiles, max_sessions=max_sessions, store=store)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        print("\nStopped.")
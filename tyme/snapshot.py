@@ -0,0 +1,186 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Iterable, Iterator
+
+from .parsing import Suggestion
+from .session import SessionState
+
+
+SNAPSHOT_VERSION = 1
+PROFILE_DIR = ".tyme-profiles"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def profile_hash(profile: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(profile, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _profile_path(snapshot_path: str, digest: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(snapshot_path)), PROFILE_DIR, f"{digest}.json.gz")
+
+
+def session_records(session: SessionState) -> Iterator[dict[str, Any]]:
+    """The records a snapshot of `session` consists of, in file order."""
+    yield {
+        "type": "header",
+        "version": SNAPSHOT_VERSION,
+        "csv_path": session.csv_path,
+        "model": session.model,
+        "task": session.task,
+        "target": session.target,
+        "profile_hash": profile_hash(session.profile),
+    }
+    yield {"type": "suggestions", "items": [s.model_dump() for s in session.suggestions]}
+    for msg in session.history:
+        yield {"type": "message", **msg}
+
+
+class SnapshotWriter:
+    """
+    Writes a session as a gzip-compressed JSON-lines snapshot.
+
+    The profile is stored once in a content-addressed file under `.tyme-profiles/`
+    next to the snapshot (shared by all sessions on the same profile); the
+    snapshot only keeps its hash. Chat messages are appended as new gzip members,
+    so saving a turn never rewrites the file; `create` (used when starting or
+    resuming a session) writes it whole, atomically.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def create(cls, path: str, session: SessionState) -> "SnapshotWriter":
+        digest = profile_hash(session.profile)
+        blob = _profile_path(path, digest)
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = f"{blob}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                f.write(_dumps(session.profile))
+            os.replace(tmp, blob)
+
+        # write to a temp file first: `path` may be the snapshot being rewritten
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for rec in session_records(session):
+                f.write(_dumps(rec) + "\n")
+        os.replace(tmp, path)
+        return cls(path)
+
+    def append(self, *messages: dict[str, str]) -> None:
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for msg in messages:
+                f.write(_dumps({"type": "message", **msg}) + "\n")
+
+
+def iter_records(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Records of a snapshot in file order. If the last append was cut short
+    (crash or Ctrl+C mid-write), reading stops cleanly before it.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        while True:
+            try:
+                line = f.readline()
+            except (EOFError, OSError, zlib.error, UnicodeDecodeError):
+                return  # truncated or corrupt trailing gzip member
+            if not line.endswith("\n"):
+                return  # end of file, or a partial record
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                return
+            yield rec
+
+
+def is_snapshot(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == _GZIP_MAGIC
+
+
+def load_snapshot(path: str) -> SessionState:
+    """
+    Restore a SessionState from a snapshot, or from a legacy `--save` JSON file.
+    """
+    if not is_snapshot(path):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return SessionState(
+            csv_path=payload["csv_path"],
+            model=payload["model"],
+            task=payload["task"],
+            target=payload.get("target"),
+            profile=payload["profile"],
+            suggestions=[Suggestion.model_validate(s) for s in payload["suggestions"]],
+            history=list(payload.get("history", [])),
+        )
+
+    header: dict[str, Any] = {}
+    suggestions: list[Suggestion] = []
+    history: list[dict[str, str]] = []
+    for rec in iter_records(path):
+        kind = rec.pop("type")
+        if kind == "header":
+            header = rec
+        elif kind == "suggestions":
+            suggestions = [Suggestion.model_validate(s) for s in rec["items"]]
+        elif kind == "message":
+            history.append(rec)
+
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version in {path}: {header.get('version')}")
+
+    blob = _profile_path(path, header["profile_hash"])
+    if not os.path.exists(blob):
+        raise FileNotFoundError(f"Profile {header['profile_hash']} for {path} not found in {os.path.dirname(blob)}")
+    with gzip.open(blob, "rt", encoding="utf-8") as f:
+        profile = json.load(f)
+
+    return SessionState(
+        csv_path=header["csv_path"],
+        model=header["model"],
+        task=header["task"],
+        target=header.get("target"),
+        profile=profile,
+        suggestions=suggestions,
+        history=history,
+    )
+
+
+def export_lines(records: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Human-readable export (suggestions, then chat history), one line at a time."""
+    for rec in records:
+        if rec["type"] == "suggestions":
+            items = rec["items"]
+            yield f"Top {len(items)} suggestions:"
+            yield "=" * 60
+            for i, s in enumerate(items, start=1):
+                yield f"\nSuggestion {i}: {s['name']}"
+                yield f"  Type: {s['feature_type']} | Risk: {s['risk']}"
+                yield "-" * 60
+                yield f"  Why: {s['why'].strip()}"
+                yield f"  How: {s['how'].strip()}"
+                yield "=" * 60
+
+            yield "\n\nChat History:"
+            yield "=" * 60
+        elif rec["type"] == "message":
+            yield f"\n[{rec['role'].upper()}]\n{rec['content']}"
+            yield "-" * 40
+
+
+def write_export(records: Iterable[dict[str, Any]], out_path: str) -> None:
+    with open(out_path, "w", encoding="utf-8") as f:
+        for line in export_lines(records):
+            f.write(line + "\n")
@@ -0,0 +1,285 @@
+from __future__ import annotations
+import hashlib
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from .parsing import Suggestion
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still line-sized, just not locked
+    fcntl = None
+
+
+NUM_PERM = 64
+# 32 bands x 2 rows: a pair at Jaccard 0.5 shares a bucket with probability
+# 1-(1-0.5**2)**32 > 0.9999, at 0.3 still ~95%. False candidates are cheap since
+# every candidate is verified with exact Jaccard.
+BANDS = 32
+# below this many entries, skip the index and compare against every entry
+EXACT_SCAN_MAX = 500
+_PRIME = 4294967291  # largest prime below 2**32, keeps a*x+b inside uint64
+
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+
+def _bucket_missing(ratio: float) -> str:
+    if ratio == 0:
+        return "none"
+    if ratio < 0.05:
+        return "low"
+    if ratio < 0.5:
+        return "mid"
+    return "high"
+
+
+def _bucket_cardinality(n: int) -> str:
+    if n <= 2:
+        return "binary"
+    if n <= 10:
+        return "low"
+    if n <= 100:
+        return "mid"
+    return "high"
+
+
+def _coarse_stats(col: dict[str, Any]) -> str:
+    parts = [f"missing={_bucket_missing(col.get('missing_ratio', 0.0))}"]
+    stats = col.get("stats") or {}
+    t = col["inferred_type"]
+    if t == "numeric" and stats:
+        scale = max(abs(stats["min"]), abs(stats["max"]))
+        parts.append(f"mag={int(math.floor(math.log10(scale))) if scale > 0 else 0}")
+        parts.append("sign=nonneg" if stats["min"] >= 0 else "sign=any")
+    elif t == "categorical":
+        parts.append(f"card={_bucket_cardinality(col.get('n_unique', 0))}")
+    elif t == "datetime" and stats:
+        parts.append(f"gran={stats.get('granularity')}")
+    return ",".join(parts)
+
+
+def schema_tokens(profile: dict[str, Any]) -> set[str]:
+    """
+    Token set describing a dataset's schema at three levels of detail per column:
+    name, name + inferred type, and name + type + coarse stats. Two extracts of
+    the same table share nearly all tokens; a renamed or retyped column only
+    changes a few.
+    """
+    tokens: set[str] = set()
+    for col in profile["columns"]:
+        name = col["name"].strip().lower()
+        t = col["inferred_type"]
+        tokens.add(f"c:{name}")
+        tokens.add(f"t:{name}:{t}")
+        tokens.add(f"s:{name}:{t}:{_coarse_stats(col)}")
+    return tokens
+
+
+def schema_fingerprint(profile: dict[str, Any]) -> str:
+    return hashlib.sha256("\n".join(sorted(schema_tokens(profile))).encode("utf-8")).hexdigest()
+
+
+def minhash(tokens: set[str]) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of a token set."""
+    if not tokens:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    x = np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens],
+        dtype=np.uint64,
+    )
+    return ((np.outer(x, _A) + _B) % _PRIME).min(axis=0)
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def adapt_suggestions(
+    suggestions: list[Suggestion],
+    profile: dict[str, Any],
+    exclude_columns: Optional[list[str]] = None,
+) -> list[Suggestion]:
+    """Keep only suggestions whose columns all exist (and are allowed) in `profile`."""
+    available = {c["name"] for c in profile["columns"]} - set(exclude_columns or [])
+    return [s for s in suggestions if all(c in available for c in s.depends_on)]
+
+
+@dataclass
+class StoreMatch:
+    fingerprint: str
+    similarity: float
+    suggestions: list[Suggestion]
+
+
+class SuggestionStore:
+    """
+    Suggestions keyed by schema fingerprint, with a MinHash/LSH index for near
+    matches. Entries only match requests with the same model, task, target and
+    excluded columns.
+
+    If `path` is given the store is an append-only JSON-lines log: each `add`
+    appends one entry under an exclusive file lock, and entries appended by other
+    processes are picked up before every lookup, so parallel workers can share
+    one store file. Later entries for the same schema replace earlier ones.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._tokens: dict[str, set[str]] = {}
+        self._buckets: list[dict[bytes, set[str]]] = [{} for _ in range(BANDS)]
+        self._offset = 0  # bytes of the log already read
+
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(fingerprint: str, meta: dict[str, Any]) -> str:
+        return hashlib.sha256(f"{fingerprint}|{json.dumps(meta, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _meta(model: str, task: str, target: Optional[str], exclude_columns: Optional[list[str]]) -> dict[str, Any]:
+        return {"model": model, "task": task, "target": target, "exclude": sorted(exclude_columns or [])}
+
+    def _bands(self, tokens: set[str]) -> list[bytes]:
+        sig = minhash(tokens)
+        rows = NUM_PERM // BANDS
+        return [sig[i * rows : (i + 1) * rows].tobytes() for i in range(BANDS)]
+
+    def _index(self, entry: dict[str, Any]) -> None:
+        key = entry["key"]
+        tokens = set(entry["tokens"])
+        if key in self._entries:
+            self._unindex(key)
+        self._entries[key] = entry
+        self._tokens[key] = tokens
+        for band, h in zip(self._buckets, self._bands(tokens)):
+            band.setdefault(h, set()).add(key)
+
+    def _unindex(self, key: str) -> None:
+        tokens = self._tokens.pop(key)
+        del self._entries[key]
+        for band, h in zip(self._buckets, self._bands(tokens)):
+            band.get(h, set()).discard(key)
+
+    def lookup(
+        self,
+        profile: dict[str, Any],
+        model: str,
+        task: str,
+        target: Optional[str],
+        exclude_columns: Optional[list[str]] = None,
+        min_similarity: float = 0.5,
+    ) -> Optional[StoreMatch]:
+        """
+        Best stored entry for this profile with estimated Jaccard similarity of
+        at least `min_similarity`, or None. Candidates come from the LSH buckets
+        (or all entries while the store is small) and are ranked by exact
+        Jaccard over the schema tokens.
+        """
+        tokens = schema_tokens(profile)
+        meta = self._meta(model, task, target, exclude_columns)
+        with self._lock:
+            self._refresh()
+            if len(self._entries) <= EXACT_SCAN_MAX:
+                candidates = set(self._entries)
+            else:
+                candidates = set()
+                for band, h in zip(self._buckets, self._bands(tokens)):
+                    candidates |= band.get(h, set())
+
+            best: Optional[tuple[float, str]] = None
+            for key in candidates:
+                entry = self._entries[key]
+                if entry["meta"] != meta:
+                    continue
+                sim = jaccard(tokens, self._tokens[key])
+                if sim >= min_similarity and (best is None or sim > best[0]):
+                    best = (sim, key)
+
+            if best is None:
+                return None
+            entry = self._entries[best[1]]
+            return StoreMatch(
+                fingerprint=entry["fingerprint"],
+                similarity=round(best[0], 4),
+                suggestions=[Suggestion.model_validate(s) for s in entry["suggestions"]],
+            )
+
+    def add(
+        self,
+        profile: dict[str, Any],
+        model: str,
+        task: str,
+        target: Optional[str],
+        suggestions: list[Suggestion],
+        exclude_columns: Optional[list[str]] = None,
+    ) -> str:
+        """Store `suggestions` for this profile (replacing an identical schema) and return its fingerprint."""
+        tokens = schema_tokens(profile)
+        fingerprint = schema_fingerprint(profile)
+        meta = self._meta(model, task, target, exclude_columns)
+        entry = {
+            "key": self._key(fingerprint, meta),
+            "fingerprint": fingerprint,
+            "meta": meta,
+            "tokens": sorted(tokens),
+            "suggestions": [s.model_dump() for s in suggestions],
+        }
+        with self._lock:
+            if self.path:
+                self._append(entry)
+                self._refresh()
+            else:
+                self._index(entry)
+        return fingerprint
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # a writer that crashed mid-line leaves no trailing newline; start
+                # a fresh line so the torn one is skipped instead of swallowing ours
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Index entries appended to the log since the last read."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # the last piece has no newline yet: another process is mid-write (read it
+        # next time), or a writer died there and the next append terminates it
+        *lines, _ = data.split(b"\n")
+        for raw in lines:
+            self._offset += len(raw) + 1
+            try:
+                self._index(json.loads(raw))
+            except (ValueError, KeyError, TypeError):
+                continue  # torn or foreign line